@@ -8,24 +8,45 @@ Integración de los tres patrones de diseño:
 
 import pygame
 import sys
+import math
 import random
-from typing import List
+from typing import Dict, List, Tuple
 
 # Importar módulos del juego
-from src.vehicles import Vehicle, VehicleFactory
+from src.vehicles import Vehicle, EmergencyVehicle, VehicleFactory
 from src.traffic_light import TrafficLight, TrafficLightController
 from src.event_system import EventSystem
 from src.config import *
-from src.collision_utils import CollisionDetector, VehicleSpacingChecker, TrafficLightChecker
+from src.collision_utils import (
+    CollisionDetector, VehicleSpacingChecker, TrafficLightChecker
+)
 from src.renderer import RoadRenderer, UIRenderer
 
 
 class Game:
     """Clase principal del juego"""
     
+    # Posiciones de spawn según dirección: (x, y, carril, dirección)
+    SPAWN_POINTS = (
+        (-50, SCREEN_HEIGHT // 2 - 30, 0, 'right'),
+        (SCREEN_WIDTH + 50, SCREEN_HEIGHT // 2 + 30, 1, 'left'),
+        (SCREEN_WIDTH // 2 - 30, -50, 2, 'down'),
+        (SCREEN_WIDTH // 2 + 30, SCREEN_HEIGHT + 50, 3, 'up')
+    )
+    
+    # Únicos eventos que procesa el juego; el resto ni siquiera se encola
+    ALLOWED_EVENTS = [
+        pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN,
+        pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED
+    ]
+    
     def __init__(self):
         pygame.init()
         
+        # Filtrar eventos desde SDL (p. ej. los MOUSEMOTION no se usan)
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(self.ALLOWED_EVENTS)
+        
         # Configuración de pantalla (pantalla completa)
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.FULLSCREEN)
         pygame.display.set_caption("Traffic Control")
@@ -54,8 +75,22 @@ class Game:
         
         # Listas de entidades
         self.vehicles: List[Vehicle] = []
+        # Vehículos que se actualizan cada frame y vehículos aparcados ante un
+        # semáforo (por dirección), que solo se reactivan cuando el semáforo cambia
+        self.vehicles_active: List[Vehicle] = []
+        self.vehicles_waiting: Dict[str, List[Vehicle]] = {
+            'right': [], 'left': [], 'down': [], 'up': []
+        }
         self.spawn_timer = 0
         self.spawn_interval = INITIAL_SPAWN_INTERVAL
+        self._stopped_count = 0  # Vehículos detenidos, mantenido por los propios vehículos
+        self._removed_pending = False  # Hay vehículos marcados sin compactar
+        # Carriles ordenados por avance; solo se reconstruyen al entrar o salir vehículos
+        self._lanes: Dict[str, List[Vehicle]] = {}
+        self._lane_positions: Dict[Vehicle, int] = {}
+        self._lanes_dirty = True
+        # Frames con congestión que faltan para emitir el siguiente evento
+        self._congestion_countdown = self._sample_geometric(CONGESTION_EVENT_PROBABILITY)
         
         # Controlador de semáforos (State Pattern)
         self.traffic_controller = TrafficLightController()
@@ -65,6 +100,10 @@ class Game:
         self.road_renderer = RoadRenderer()
         self.ui_renderer = UIRenderer()
         
+        # Regiones dibujadas en el frame anterior (al inicio, toda la pantalla)
+        self._screen_rect = self.screen.get_rect()
+        self._prev_rects: List[pygame.Rect] = [self._screen_rect]
+        
         # Game over
         self.game_over = False
     
@@ -100,49 +139,206 @@ class Game:
             'horizontal': [light_h1, light_h2],
             'vertical': [light_v1, light_v2]
         }
+        
+        # Dirección de tráfico que controla cada semáforo
+        for light, direction in [(light_h1, 'right'), (light_h2, 'left'),
+                                 (light_v1, 'down'), (light_v2, 'up')]:
+            self.traffic_controller.assign_direction(light, direction)
+            light.add_state_listener(self.on_light_changed)
     
     def spawn_vehicle(self):
         """Genera un nuevo vehículo en una posición aleatoria"""
-        directions = ['left', 'right', 'up', 'down']
-        direction = random.choice(directions)
-        
-        center_y = SCREEN_HEIGHT // 2
-        center_x = SCREEN_WIDTH // 2
-        
-        # Posiciones de spawn según dirección
-        spawn_positions = {
-            'right': (-50, center_y - 30, 0),
-            'left': (SCREEN_WIDTH + 50, center_y + 30, 1),
-            'down': (center_x - 30, -50, 2),
-            'up': (center_x + 30, SCREEN_HEIGHT + 50, 3)
-        }
-        
-        x, y, lane = spawn_positions[direction]
+        # getrandbits(2) elige uno de los 4 puntos sin construir listas
+        x, y, lane, direction = self.SPAWN_POINTS[random.getrandbits(2)]
         
         # Crear vehículo aleatorio usando el Factory (Template Method)
         vehicle = VehicleFactory.create_random_vehicle(x, y, direction, lane)
+        vehicle.on_stopped_changed = self.on_vehicle_stopped_changed
         self.vehicles.append(vehicle)
+        self.vehicles_active.append(vehicle)
+        self._lanes_dirty = True
+    
+    def on_vehicle_stopped_changed(self, delta: int):
+        """Observador de vehículos: ajusta el contador de detenidos"""
+        self._stopped_count += delta
+    
+    def remove_vehicle(self, vehicle: Vehicle):
+        """
+        Marca un vehículo como eliminado manteniendo el contador de detenidos.
+        Las listas se compactan una sola vez por frame en sweep_vehicles().
+        """
+        if vehicle.removed:
+            return
+        vehicle.removed = True
+        self._removed_pending = True
+        self._lanes_dirty = True
+        if vehicle.stopped:
+            self._stopped_count -= 1
+        vehicle.on_stopped_changed = None
+        
+        if vehicle.parked:
+            # Los que esperaban detrás de él ya no están bloqueados
+            self.release_waiting(vehicle.direction)
+    
+    def sweep_vehicles(self):
+        """Compacta las listas de vehículos descartando los marcados como eliminados"""
+        if not self._removed_pending:
+            return
+        self._removed_pending = False
+        self.vehicles = [v for v in self.vehicles if not v.removed]
+        self.vehicles_active = [v for v in self.vehicles_active if not v.removed]
+    
+    def on_light_changed(self, light: TrafficLight):
+        """Observador de semáforos: reactiva los vehículos que esperaban en él"""
+        self.release_waiting(self.traffic_controller.light_directions[light])
+    
+    def release_waiting(self, direction: str):
+        """
+        Devuelve a la lista activa los vehículos aparcados en una dirección,
+        conservando el orden de aparición para que se actualicen como antes.
+        """
+        waiting = self.vehicles_waiting[direction]
+        if waiting:
+            for vehicle in waiting:
+                vehicle.parked = False
+            waiting.clear()
+            self.vehicles_active = [v for v in self.vehicles
+                                    if not (v.parked or v.removed)]
+    
+    def can_park(self, vehicle: Vehicle, can_move_light: bool, can_move_spacing: bool,
+                 vehicle_ahead: Vehicle) -> bool:
+        """
+        Indica si un vehículo detenido puede dejar de actualizarse mientras espera:
+        está parado ante el rojo, o detrás de otro vehículo que ya está aparcado.
+        Solo se aparcan los vehículos que no se mueven por sí solos estando parados.
+        """
+        if vehicle.speed > 0 or not vehicle.is_idle_while_stopped():
+            return False
+        
+        if not can_move_light:
+            return True
+        
+        if not can_move_spacing:
+            return vehicle_ahead is not None and vehicle_ahead.parked
+        
+        return False
+    
+    def update_vehicles(self, dt: float):
+        """
+        Paso de simulación de los vehículos activos: semáforo, distancia con el
+        de adelante y movimiento, fusionados en un único recorrido.
+        """
+        # Estado de los semáforos por dirección, mantenido por el controlador
+        light_summary = self.traffic_controller.light_summary
+        
+        # Vehículos agrupados por dirección y ordenados por avance. Los vehículos
+        # solo avanzan y advance_in_lane mantiene el orden, así que basta con
+        # reconstruir cuando cambia el conjunto de vehículos
+        if self._lanes_dirty:
+            self._lanes, self._lane_positions = VehicleSpacingChecker.build_lanes(self.vehicles)
+            self._lanes_dirty = False
+        lanes = self._lanes
+        lane_positions = self._lane_positions
+        
+        # Referencias locales para el bucle
+        can_pass_light = TrafficLightChecker.can_pass_precomputed
+        get_vehicle_ahead = VehicleSpacingChecker.get_vehicle_ahead_sorted
+        can_move_behind = VehicleSpacingChecker.can_move_behind
+        advance_in_lane = VehicleSpacingChecker.advance_in_lane
+        waiting = self.vehicles_waiting
+        
+        still_active = []
+        overtaken = set()
+        for vehicle in self.vehicles_active:
+            lane = lanes[vehicle.direction]
+            
+            # Verificar si puede moverse usando las utilidades; si el semáforo
+            # ya lo detiene no hace falta buscar el vehículo de adelante
+            can_move_light = can_pass_light(vehicle, light_summary)
+            if can_move_light:
+                vehicle_ahead, distance = get_vehicle_ahead(vehicle, lane, lane_positions[vehicle])
+                can_move_spacing = can_move_behind(vehicle, vehicle_ahead, distance)
+            else:
+                vehicle_ahead = None
+                can_move_spacing = True
+            
+            vehicle.update(dt, can_move_light and can_move_spacing)
+            if advance_in_lane(vehicle, lane, lane_positions):
+                # Los aparcados que quedan detrás ya no tienen el mismo vehículo delante
+                overtaken.add(vehicle.direction)
+            
+            # Remover vehículos fuera de pantalla
+            if vehicle.is_off_screen(SCREEN_WIDTH, SCREEN_HEIGHT):
+                self.remove_vehicle(vehicle)
+                
+                # Dar puntos por vehículo que pasó exitosamente
+                self.event_system.emit_event('vehicle_passed', {
+                    'vehicle': vehicle
+                })
+            
+            elif self.can_park(vehicle, can_move_light, can_move_spacing, vehicle_ahead):
+                vehicle.parked = True
+                waiting[vehicle.direction].append(vehicle)
+            else:
+                still_active.append(vehicle)
+        
+        self.vehicles_active = still_active
+        for direction in overtaken:
+            self.release_waiting(direction)
     
     def check_collisions(self):
         """Detecta colisiones entre vehículos usando CollisionDetector"""
-        for i, v1 in enumerate(self.vehicles):
-            for v2 in self.vehicles[i+1:]:
-                if CollisionDetector.check_collision(v1, v2):
-                    # Emitir evento de colisión (Chain of Responsibility)
-                    event = self.event_system.emit_event('collision', {
-                        'vehicle1': v1,
-                        'vehicle2': v2
-                    })
-                    
-                    # Remover vehículos colisionados
-                    if 'remove_vehicles' in event.data:
-                        for v in event.data['remove_vehicles']:
-                            if v in self.vehicles:
-                                self.vehicles.remove(v)
+        # Solo los vehículos dentro de la intersección pueden colisionar
+        vehicles = CollisionDetector.filter_in_intersection(self.vehicles)
+        if len(vehicles) < 2:
+            return
+        
+        different_directions = CollisionDetector.are_in_different_directions
+        emit = self.event_system.emit_event
+        
+        # Bordes de colisión, calculados como mucho una vez por vehículo;
+        # las posiciones no cambian durante la detección
+        get_bounds = CollisionDetector.get_rect_bounds
+        bounds_overlap = CollisionDetector.bounds_overlap
+        bounds: Dict[int, Tuple[int, int, int, int]] = {}
+        
+        # Cajas de esos vehículos como arreglos paralelos, una vez por frame
+        px, py, hw, hh = CollisionDetector.get_bounds_arrays(vehicles)
+        
+        # Solo los pares cuyas cajas se solapan pasan a la prueba precisa;
+        # las eliminaciones solo marcan vehículos, así que los índices siguen siendo válidos
+        for i, j in CollisionDetector.overlapping_pairs(px, py, hw, hh):
+            v1 = vehicles[i]
+            v2 = vehicles[j]
+            if v1.removed or v2.removed:
+                continue
+            
+            # Prueba precisa de check_collision; ambos ya están en la intersección
+            if not different_directions(v1, v2):
+                continue
+            
+            bounds1 = bounds.get(i)
+            if bounds1 is None:
+                bounds1 = bounds[i] = get_bounds(v1)
+            bounds2 = bounds.get(j)
+            if bounds2 is None:
+                bounds2 = bounds[j] = get_bounds(v2)
+            
+            if bounds_overlap(bounds1, bounds2):
+                # Emitir evento de colisión (Chain of Responsibility)
+                event = emit('collision', {
+                    'vehicle1': v1,
+                    'vehicle2': v2
+                })
+                
+                # Remover vehículos colisionados
+                if 'remove_vehicles' in event.data:
+                    for v in event.data['remove_vehicles']:
+                        self.remove_vehicle(v)
     
     def check_congestion(self):
         """Detecta congestión de tráfico"""
-        stopped_vehicles = sum(1 for v in self.vehicles if v.stopped)
+        stopped_vehicles = self._stopped_count
         
         if stopped_vehicles > 15:
             level = 'critical'
@@ -155,12 +351,20 @@ class Game:
         else:
             return
         
-        # Emitir evento de congestión periódicamente
-        if random.random() < 0.01:  # 1% de probabilidad por frame
+        # Emitir evento de congestión periódicamente (1% de probabilidad por frame),
+        # con una cuenta regresiva en lugar de un número aleatorio por frame
+        self._congestion_countdown -= 1
+        if self._congestion_countdown <= 0:
             self.event_system.emit_event('congestion', {
                 'level': level,
                 'waiting_vehicles': stopped_vehicles
             })
+            self._congestion_countdown = self._sample_geometric(CONGESTION_EVENT_PROBABILITY)
+    
+    @staticmethod
+    def _sample_geometric(p: float) -> int:
+        """Número de intentos hasta el primer éxito con probabilidad p por intento"""
+        return max(1, math.ceil(math.log(1.0 - random.random()) / math.log(1.0 - p)))
     
     def update(self, dt: float):
         """Actualiza el estado del juego"""
@@ -194,32 +398,21 @@ class Game:
             self.spawn_interval = max(MIN_SPAWN_INTERVAL, 
                                      INITIAL_SPAWN_INTERVAL - (self.game_state['level'] * SPAWN_DIFFICULTY_INCREASE))
         
-        # Actualizar vehículos (Template Method)
-        for vehicle in self.vehicles[:]:
-            # Verificar si puede moverse usando las utilidades
-            can_move_light = TrafficLightChecker.can_pass_traffic_light(vehicle, self.lights)
-            can_move_spacing = VehicleSpacingChecker.can_move_forward(vehicle, self.vehicles)
-            can_move = can_move_light and can_move_spacing
-            
-            vehicle.update(dt, can_move)
-            
-            # Remover vehículos fuera de pantalla
-            if vehicle.is_off_screen(SCREEN_WIDTH, SCREEN_HEIGHT):
-                self.vehicles.remove(vehicle)
-                
-                # Dar puntos por vehículo que pasó exitosamente
-                self.event_system.emit_event('vehicle_passed', {
-                    'vehicle': vehicle
-                })
+        # Actualizar vehículos (Template Method); los aparcados no cambian
+        self.update_vehicles(dt)
         
         # Detectar colisiones (Chain of Responsibility)
         self.check_collisions()
         
+        # Compactar las listas una vez por frame
+        self.sweep_vehicles()
+        
         # Detectar congestión
         self.check_congestion()
         
-        # Actualizar notificaciones
-        self.event_system.update_notifications()
+        # Actualizar notificaciones (solo si hay alguna)
+        if self.event_system.has_notifications():
+            self.event_system.update_notifications()
         
         # Aumentar nivel
         if self.game_state['vehicles_passed'] > 0 and \
@@ -231,32 +424,76 @@ class Game:
             self.game_over = True
     
     def draw(self):
-        """Dibuja todos los elementos del juego"""
-        # Fondo y calles
-        self.road_renderer.draw(self.screen)
+        """
+        Dibuja todos los elementos del juego.
+        Solo se restaura el fondo y se presenta en pantalla lo que cambió
+        (regiones del frame anterior y del actual), salvo que cubra gran parte de ella.
+        """
+        max_dirty_area = self._screen_rect.width * self._screen_rect.height * DIRTY_RECT_MAX_FRACTION
+        
+        # Fondo y calles: restaurar donde se dibujó el frame anterior
+        if self._area(self._prev_rects) > max_dirty_area:
+            self.road_renderer.draw_fast(self.screen)
+        else:
+            for rect in self._prev_rects:
+                self.road_renderer.draw_fast(self.screen, rect)
+        
+        dirty_rects = []
         
         # Semáforos
-        self.traffic_controller.draw_all(self.screen)
+        dirty_rects.extend(self.traffic_controller.draw_all(self.screen))
         
-        # Vehículos
+        # Vehículos: se descartan los que están fuera de pantalla y las
+        # imágenes del resto se envían en un solo lote a Surface.blits
+        sprites = []
+        visible = []
         for vehicle in self.vehicles:
-            vehicle.draw(self.screen)
+            sprite = vehicle.get_blit()
+            rect = sprite[1] if sprite else vehicle.get_rect()
+            if not self._screen_rect.colliderect(rect):
+                continue
+            
+            visible.append(vehicle)
+            dirty_rects.append(rect)
+            if sprite:
+                sprites.append(sprite)
+            else:
+                vehicle.draw_fallback(self.screen)
+        self.screen.blits(sprites, doreturn=False)
+        
+        EmergencyVehicle.update_siren(pygame.time.get_ticks())
+        for vehicle in visible:
+            vehicle.draw_overlay(self.screen)
         
         # UI
-        self.ui_renderer.draw_hud(self.screen, self.game_state)
+        dirty_rects.extend(self.ui_renderer.draw_hud(self.screen, self.game_state))
         
         # Notificaciones de eventos
-        self.event_system.draw_notifications(self.screen)
+        if self.event_system.has_notifications():
+            dirty_rects.extend(self.event_system.draw_notifications(self.screen))
         
         # Pausa
         if self.paused:
             self.ui_renderer.draw_pause_screen(self.screen)
+            dirty_rects = [self._screen_rect]
         
         # Game Over
         if self.game_over:
             self.ui_renderer.draw_game_over(self.screen, self.game_state)
+            dirty_rects = [self._screen_rect]
         
-        pygame.display.flip()
+        update_rects = self._prev_rects + dirty_rects
+        if self._area(update_rects) > max_dirty_area:
+            pygame.display.flip()
+        else:
+            pygame.display.update(update_rects)
+        
+        self._prev_rects = dirty_rects
+    
+    @staticmethod
+    def _area(rects: List[pygame.Rect]) -> int:
+        """Área total (aproximada, sin descontar solapamientos) de una lista de regiones"""
+        return sum(rect.width * rect.height for rect in rects)
     
     def handle_events(self):
         """Maneja los eventos de pygame"""
@@ -274,6 +511,7 @@ class Game:
                 elif event.key == pygame.K_F11:
                     # Alternar pantalla completa
                     pygame.display.toggle_fullscreen()
+                    self._prev_rects = [self._screen_rect]  # Redibujar todo
             
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:  # Click izquierdo
@@ -283,14 +521,29 @@ class Game:
                     light = self.traffic_controller.get_light_at_position(x, y)
                     if light:
                         light.cycle_state()
+            
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                # La ventana se volvió a mostrar: redibujar todo
+                self._prev_rects = [self._screen_rect]
     
     def run(self):
         """Loop principal del juego"""
+        # Tiempo real acumulado pendiente de simular en pasos fijos
+        accumulator = 0.0
+        
         while self.running:
-            dt = self.clock.tick(FPS) / 1000.0
+            accumulator += self.clock.tick(FPS) / 1000.0
             
             self.handle_events()
-            self.update(dt)
+            
+            steps = 0
+            while accumulator >= SIMULATION_STEP and steps < MAX_STEPS_PER_FRAME:
+                self.update(SIMULATION_STEP)
+                accumulator -= SIMULATION_STEP
+                steps += 1
+            if steps == MAX_STEPS_PER_FRAME:
+                accumulator = min(accumulator, SIMULATION_STEP)
+            
             self.draw()
         
         pygame.quit()
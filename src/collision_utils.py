@@ -3,7 +3,7 @@ Utilidades para manejo de colisiones y geometría
 """
 
 import pygame
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from src.vehicles import Vehicle
 from src.config import (
     SCREEN_WIDTH, SCREEN_HEIGHT, INTERSECTION_SIZE,
@@ -15,27 +15,72 @@ from src.config import (
 class CollisionDetector:
     """Maneja la detección de colisiones entre vehículos"""
     
+    # Zona de la intersección, fija durante todo el juego
+    INTERSECTION_ZONE = pygame.Rect(
+        SCREEN_WIDTH // 2 - INTERSECTION_SIZE // 2,
+        SCREEN_HEIGHT // 2 - INTERSECTION_SIZE // 2,
+        INTERSECTION_SIZE,
+        INTERSECTION_SIZE
+    )
+    # Sus bordes, para comparar sin llamar a collidepoint (como él, incluye el borde
+    # izquierdo y el superior, pero no el derecho ni el inferior)
+    ZONE_LEFT, ZONE_TOP = INTERSECTION_ZONE.left, INTERSECTION_ZONE.top
+    ZONE_RIGHT, ZONE_BOTTOM = INTERSECTION_ZONE.right, INTERSECTION_ZONE.bottom
+    
     @staticmethod
     def are_in_intersection(v1: Vehicle, v2: Vehicle) -> bool:
         """Verifica si ambos vehículos están en la intersección"""
-        center_x = SCREEN_WIDTH // 2
-        center_y = SCREEN_HEIGHT // 2
-        
-        intersection_zone = pygame.Rect(
-            center_x - INTERSECTION_SIZE // 2,
-            center_y - INTERSECTION_SIZE // 2,
-            INTERSECTION_SIZE,
-            INTERSECTION_SIZE
-        )
-        
-        return (intersection_zone.collidepoint(v1.x, v1.y) and 
-                intersection_zone.collidepoint(v2.x, v2.y))
+        left, right = CollisionDetector.ZONE_LEFT, CollisionDetector.ZONE_RIGHT
+        top, bottom = CollisionDetector.ZONE_TOP, CollisionDetector.ZONE_BOTTOM
+        return (left <= v1.x < right and top <= v1.y < bottom and
+                left <= v2.x < right and top <= v2.y < bottom)
     
     @staticmethod
     def are_in_different_directions(v1: Vehicle, v2: Vehicle) -> bool:
         """Verifica si dos vehículos van en direcciones diferentes"""
         return v1.direction != v2.direction
     
+    @staticmethod
+    def filter_in_intersection(vehicles: List[Vehicle]) -> List[Vehicle]:
+        """
+        Retorna, en el mismo orden, los vehículos cuyo centro está en la intersección.
+        Un par solo puede colisionar si ambos están en esta lista.
+        """
+        left, right = CollisionDetector.ZONE_LEFT, CollisionDetector.ZONE_RIGHT
+        top, bottom = CollisionDetector.ZONE_TOP, CollisionDetector.ZONE_BOTTOM
+        
+        return [vehicle for vehicle in vehicles
+                if left <= vehicle.x < right and top <= vehicle.y < bottom]
+    
+    @staticmethod
+    def get_bounds_arrays(vehicles: List[Vehicle]) -> Tuple[List[float], List[float],
+                                                           List[float], List[float]]:
+        """
+        Extrae las cajas de los vehículos como arreglos paralelos (estructura de arreglos):
+        centros x, centros y, medias anchuras y medias alturas.
+        """
+        px, py, hw, hh = [], [], [], []
+        for vehicle in vehicles:
+            w, h = vehicle.rect_size
+            px.append(vehicle.x)
+            py.append(vehicle.y)
+            hw.append(w / 2)
+            hh.append(h / 2)
+        return px, py, hw, hh
+    
+    @staticmethod
+    def overlapping_pairs(px: List[float], py: List[float],
+                          hw: List[float], hh: List[float]) -> List[Tuple[int, int]]:
+        """
+        Fase amplia numérica: retorna los pares de índices (i, j), con i < j,
+        cuyas cajas se solapan.
+        Es conservadora: deja 1 píxel de margen por el redondeo de get_rect().
+        """
+        n = len(px)
+        return [(i, j) for i in range(n) for j in range(i + 1, n)
+                if abs(px[i] - px[j]) <= hw[i] + hw[j] + 1
+                and abs(py[i] - py[j]) <= hh[i] + hh[j] + 1]
+    
     @staticmethod
     def check_collision(v1: Vehicle, v2: Vehicle) -> bool:
         """Verifica si dos vehículos colisionan"""
@@ -48,7 +93,24 @@ class CollisionDetector:
             return False
         
         # Verificar colisión de rectángulos
-        return v1.get_rect().colliderect(v2.get_rect())
+        return CollisionDetector.bounds_overlap(CollisionDetector.get_rect_bounds(v1),
+                                                CollisionDetector.get_rect_bounds(v2))
+    
+    @staticmethod
+    def get_rect_bounds(vehicle: Vehicle) -> Tuple[int, int, int, int]:
+        """
+        Bordes (izquierda, arriba, derecha, abajo) del rectángulo de get_rect(),
+        calculados sin construir el Rect (pygame trunca las coordenadas hacia cero).
+        """
+        w, h = vehicle.rect_size
+        left = int(vehicle.x - w // 2)
+        top = int(vehicle.y - h // 2)
+        return left, top, left + w, top + h
+    
+    @staticmethod
+    def bounds_overlap(b1: Tuple[int, int, int, int], b2: Tuple[int, int, int, int]) -> bool:
+        """Equivalente a Rect.colliderect para bordes de get_rect_bounds()"""
+        return b1[0] < b2[2] and b2[0] < b1[2] and b1[1] < b2[3] and b2[1] < b1[3]
 
 
 class VehicleSpacingChecker:
@@ -61,7 +123,7 @@ class VehicleSpacingChecker:
         min_distance = float('inf')
         
         for other in all_vehicles:
-            if other == vehicle or other.direction != vehicle.direction:
+            if other == vehicle or other.removed or other.direction != vehicle.direction:
                 continue
             
             # Verificar si están en el mismo carril (aproximadamente)
@@ -77,45 +139,101 @@ class VehicleSpacingChecker:
         
         return closest_vehicle
     
+    @staticmethod
+    def build_lanes(vehicles: List[Vehicle]) -> Tuple[Dict[str, List[Vehicle]], Dict[Vehicle, int]]:
+        """
+        Agrupa los vehículos por dirección y ordena cada grupo según su avance,
+        de modo que los vehículos de adelante quedan después en la lista.
+        Retorna los grupos y la posición de cada vehículo dentro del suyo.
+        """
+        lanes = {'right': [], 'left': [], 'down': [], 'up': []}
+        for vehicle in vehicles:
+            lanes[vehicle.direction].append(vehicle)
+        
+        positions = {}
+        for lane in lanes.values():
+            lane.sort(key=lambda v: v.dx * v.x + v.dy * v.y)
+            for index, vehicle in enumerate(lane):
+                positions[vehicle] = index
+        
+        return lanes, positions
+    
+    @staticmethod
+    def advance_in_lane(vehicle: Vehicle, lane: List[Vehicle], positions: Dict[Vehicle, int]) -> bool:
+        """
+        Mantiene ordenado el grupo tras mover un vehículo durante el frame.
+        Los vehículos solo avanzan, así que basta con desplazarlo hacia adelante.
+        Retorna True si adelantó a algún vehículo aparcado.
+        """
+        index = positions[vehicle]
+        progress = vehicle.dx * vehicle.x + vehicle.dy * vehicle.y
+        passed_parked = False
+        while index + 1 < len(lane):
+            other = lane[index + 1]
+            if other.dx * other.x + other.dy * other.y >= progress:
+                break
+            passed_parked = passed_parked or other.parked
+            lane[index] = other
+            positions[other] = index
+            index += 1
+        lane[index] = vehicle
+        positions[vehicle] = index
+        return passed_parked
+    
+    @staticmethod
+    def get_vehicle_ahead_sorted(vehicle: Vehicle, lane: List[Vehicle],
+                                 position: int) -> Tuple[Optional[Vehicle], Optional[float]]:
+        """
+        Como get_vehicle_ahead, pero usando el grupo ordenado de build_lanes():
+        el primer vehículo posterior en el mismo carril es el más cercano.
+        Retorna también la distancia hasta él, para no volver a calcularla.
+        """
+        for index in range(position + 1, len(lane)):
+            other = lane[index]
+            if other.removed or not VehicleSpacingChecker._are_in_same_lane(vehicle, other):
+                continue
+            
+            distance = VehicleSpacingChecker._get_distance_ahead(vehicle, other)
+            if distance is not None:
+                return other, distance
+        
+        return None, None
+    
     @staticmethod
     def _are_in_same_lane(v1: Vehicle, v2: Vehicle) -> bool:
         """Verifica si dos vehículos están en el mismo carril"""
         tolerance = 30  # Píxeles de tolerancia
         
-        if v1.direction in ['left', 'right']:
-            # Para movimiento horizontal, comparar Y
-            return abs(v1.y - v2.y) < tolerance
-        else:
-            # Para movimiento vertical, comparar X
-            return abs(v1.x - v2.x) < tolerance
+        # Desplazamiento perpendicular a la dirección de v1: compara Y para
+        # movimiento horizontal y X para vertical
+        lateral = v1.dx * (v1.y - v2.y) + v1.dy * (v1.x - v2.x)
+        return abs(lateral) < tolerance
     
     @staticmethod
     def _get_distance_ahead(vehicle: Vehicle, other: Vehicle) -> Optional[float]:
         """Calcula la distancia al vehículo adelante, retorna None si está atrás"""
-        if vehicle.direction == 'right':
-            if other.x > vehicle.x:
-                return other.x - vehicle.x
-        elif vehicle.direction == 'left':
-            if other.x < vehicle.x:
-                return vehicle.x - other.x
-        elif vehicle.direction == 'down':
-            if other.y > vehicle.y:
-                return other.y - vehicle.y
-        elif vehicle.direction == 'up':
-            if other.y < vehicle.y:
-                return vehicle.y - other.y
-        
-        return None
+        # Proyección sobre el vector de dirección del vehículo
+        distance = vehicle.dx * (other.x - vehicle.x) + vehicle.dy * (other.y - vehicle.y)
+        return distance if distance > 0 else None
     
     @staticmethod
     def can_move_forward(vehicle: Vehicle, all_vehicles: List[Vehicle]) -> bool:
         """Verifica si el vehículo puede moverse sin chocar con el de adelante"""
         vehicle_ahead = VehicleSpacingChecker.get_vehicle_ahead(vehicle, all_vehicles)
-        
+        return VehicleSpacingChecker.can_move_behind(vehicle, vehicle_ahead)
+    
+    @staticmethod
+    def can_move_behind(vehicle: Vehicle, vehicle_ahead: Optional[Vehicle],
+                        distance: Optional[float] = None) -> bool:
+        """
+        Verifica si el vehículo puede moverse dado el vehículo que tiene adelante.
+        Si ya se conoce la distancia hasta él (get_vehicle_ahead_sorted) se reutiliza.
+        """
         if vehicle_ahead is None:
             return True
         
-        distance = VehicleSpacingChecker._get_distance_ahead(vehicle, vehicle_ahead)
+        if distance is None:
+            distance = VehicleSpacingChecker._get_distance_ahead(vehicle, vehicle_ahead)
         
         if distance is None:
             return True
@@ -129,78 +247,86 @@ class VehicleSpacingChecker:
 class TrafficLightChecker:
     """Verifica si un vehículo puede pasar según los semáforos"""
     
+    # Semáforo que controla cada dirección: (grupo en `lights`, índice)
+    LIGHT_FOR_DIRECTION = {
+        'right': ('horizontal', 0),
+        'left': ('horizontal', 1),
+        'down': ('vertical', 0),
+        'up': ('vertical', 1)
+    }
+    
+    # Geometría fija por dirección, medida sobre el avance con signo del vehículo
+    # (dx * x + dy * y): (línea de paso, límite de la zona, centro de la intersección).
+    # Con el signo, "x >= parada" y "x <= parada" se reducen a la misma comparación.
+    STOP_ZONES = {
+        'right': (SCREEN_WIDTH // 2 - STOP_LINE_DISTANCE, SCREEN_WIDTH // 2 - 50,
+                  SCREEN_WIDTH // 2),
+        'left': (-(SCREEN_WIDTH // 2 + STOP_LINE_DISTANCE), -(SCREEN_WIDTH // 2 + 50),
+                 -(SCREEN_WIDTH // 2)),
+        'down': (SCREEN_HEIGHT // 2 - STOP_LINE_DISTANCE, SCREEN_HEIGHT // 2 - 50,
+                 SCREEN_HEIGHT // 2),
+        'up': (-(SCREEN_HEIGHT // 2 + STOP_LINE_DISTANCE), -(SCREEN_HEIGHT // 2 + 50),
+               -(SCREEN_HEIGHT // 2))
+    }
+    
+    # Distancia al centro bajo la cual un vehículo se considera cerca de la línea
+    NEAR_STOP_LINE_THRESHOLD = 150
+    
+    @staticmethod
+    def get_light_summary(lights: dict) -> Dict[str, bool]:
+        """Resume, una vez por frame, si cada dirección tiene paso"""
+        return {
+            direction: lights[group][index].can_pass()
+            for direction, (group, index) in TrafficLightChecker.LIGHT_FOR_DIRECTION.items()
+        }
+    
     @staticmethod
     def can_pass_traffic_light(vehicle: Vehicle, lights: dict) -> bool:
         """Verifica si el vehículo puede pasar el semáforo"""
-        center_x = SCREEN_WIDTH // 2
-        center_y = SCREEN_HEIGHT // 2
-        
+        return TrafficLightChecker.can_pass_precomputed(
+            vehicle, TrafficLightChecker.get_light_summary(lights))
+    
+    @staticmethod
+    def can_pass_precomputed(vehicle: Vehicle, light_summary: Dict[str, bool]) -> bool:
+        """Verifica si el vehículo puede pasar usando el resumen de get_light_summary()"""
         # Vehículos de emergencia que se saltan semáforos cambian de carril
         if vehicle.has_priority and not TrafficLightChecker._is_near_stop_line(vehicle):
             TrafficLightChecker._change_lane_if_needed(vehicle)
             return True
         
-        # Calcular posición de parada según tamaño del vehículo
-        # El vehículo debe parar ANTES de la línea, considerando su tamaño
-        vehicle_half_length = vehicle.size[0] // 2
-        
-        if vehicle.direction == 'right':
-            # La línea está en center_x - STOP_LINE_DISTANCE
-            # El vehículo para cuando su frente (x + mitad) llega a la línea
-            stop_point = center_x - STOP_LINE_DISTANCE - vehicle_half_length - DETECTION_MARGIN
-            if vehicle.x >= stop_point and vehicle.x < center_x - 50:
-                return lights['horizontal'][0].can_pass()
-                
-        elif vehicle.direction == 'left':
-            # La línea está en center_x + STOP_LINE_DISTANCE
-            # El vehículo para cuando su frente (x - mitad) llega a la línea
-            stop_point = center_x + STOP_LINE_DISTANCE + vehicle_half_length + DETECTION_MARGIN
-            if vehicle.x <= stop_point and vehicle.x > center_x + 50:
-                return lights['horizontal'][1].can_pass()
-                
-        elif vehicle.direction == 'down':
-            # La línea está en center_y - STOP_LINE_DISTANCE
-            stop_point = center_y - STOP_LINE_DISTANCE - vehicle_half_length - DETECTION_MARGIN
-            if vehicle.y >= stop_point and vehicle.y < center_y - 50:
-                return lights['vertical'][0].can_pass()
-                
-        elif vehicle.direction == 'up':
-            # La línea está en center_y + STOP_LINE_DISTANCE
-            stop_point = center_y + STOP_LINE_DISTANCE + vehicle_half_length + DETECTION_MARGIN
-            if vehicle.y <= stop_point and vehicle.y > center_y + 50:
-                return lights['vertical'][1].can_pass()
-        
-        return True
+        # Con el semáforo en verde no importa la posición
+        if light_summary[vehicle.direction]:
+            return True
+        
+        # El vehículo debe parar ANTES de la línea, considerando su tamaño:
+        # para cuando su frente (centro + mitad) llega a la línea
+        stop_line, zone_limit, _ = TrafficLightChecker.STOP_ZONES[vehicle.direction]
+        position = vehicle.dx * vehicle.x + vehicle.dy * vehicle.y
+        stop_point = stop_line - vehicle.size[0] // 2 - DETECTION_MARGIN
+        
+        return not (stop_point <= position < zone_limit)
     
     @staticmethod
     def _is_near_stop_line(vehicle: Vehicle) -> bool:
         """Verifica si el vehículo está cerca de la línea de parada"""
-        center_x = SCREEN_WIDTH // 2
-        center_y = SCREEN_HEIGHT // 2
-        threshold = 150
-        
-        if vehicle.direction in ['left', 'right']:
-            return abs(vehicle.x - center_x) < threshold
-        else:
-            return abs(vehicle.y - center_y) < threshold
+        center = TrafficLightChecker.STOP_ZONES[vehicle.direction][2]
+        position = vehicle.dx * vehicle.x + vehicle.dy * vehicle.y
+        return abs(position - center) < TrafficLightChecker.NEAR_STOP_LINE_THRESHOLD
     
     @staticmethod
     def _change_lane_if_needed(vehicle: Vehicle):
         """Cambia de carril al vehículo de emergencia para pasar semáforo en rojo"""
-        center_x = SCREEN_WIDTH // 2
-        center_y = SCREEN_HEIGHT // 2
         lane_offset = LANE_WIDTH // 2
         
-        # Solo cambiar si está cerca de la intersección
-        if vehicle.direction == 'right':
-            if center_x - 200 < vehicle.x < center_x - 100:
-                vehicle.y += lane_offset if vehicle.y < center_y else -lane_offset
-        elif vehicle.direction == 'left':
-            if center_x + 100 < vehicle.x < center_x + 200:
-                vehicle.y += lane_offset if vehicle.y < center_y else -lane_offset
-        elif vehicle.direction == 'down':
-            if center_y - 200 < vehicle.y < center_y - 100:
-                vehicle.x += lane_offset if vehicle.x < center_x else -lane_offset
-        elif vehicle.direction == 'up':
-            if center_y + 100 < vehicle.y < center_y + 200:
-                vehicle.x += lane_offset if vehicle.x < center_x else -lane_offset
+        # Solo cambiar si está cerca de la intersección: entre 200 y 100 píxeles
+        # antes del centro, medido sobre su avance con signo
+        center = TrafficLightChecker.STOP_ZONES[vehicle.direction][2]
+        position = vehicle.dx * vehicle.x + vehicle.dy * vehicle.y
+        if not center - 200 < position < center - 100:
+            return
+        
+        # Desplazarlo hacia el carril contrario al lado en el que va
+        if vehicle.dy == 0:  # Movimiento horizontal
+            vehicle.y += lane_offset if vehicle.y < SCREEN_HEIGHT // 2 else -lane_offset
+        else:
+            vehicle.x += lane_offset if vehicle.x < SCREEN_WIDTH // 2 else -lane_offset
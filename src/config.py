@@ -7,6 +7,15 @@ SCREEN_WIDTH = 1200
 SCREEN_HEIGHT = 800
 FPS = 60
 
+# Paso fijo de simulación y máximo de pasos por frame (evita saltos y
+# frames enormes tras un bloqueo; el tiempo que exceda se descarta)
+SIMULATION_STEP = 1.0 / FPS
+MAX_STEPS_PER_FRAME = 5
+
+# Renderizado por regiones sucias: si cubren más de esta fracción de la
+# pantalla se vuelve a redibujar y presentar la pantalla completa
+DIRTY_RECT_MAX_FRACTION = 0.25
+
 # Colores
 ROAD_COLOR = (60, 60, 60)
 LINE_COLOR = (255, 255, 255)
@@ -51,6 +60,9 @@ PENALTY_CONGESTION_MEDIUM = 15
 PENALTY_CONGESTION_HIGH = 30
 PENALTY_CONGESTION_CRITICAL = 50
 
+# Probabilidad por frame congestionado de emitir un evento de congestión
+CONGESTION_EVENT_PROBABILITY = 0.01
+
 # Configuración de semáforos
 DEFAULT_GREEN_DURATION = 6.0
 DEFAULT_YELLOW_DURATION = 2.0
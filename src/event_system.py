@@ -4,7 +4,8 @@ Implementación de cadena de manejadores para procesar eventos del juego
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from collections import deque
+from typing import Optional, Dict, Any, List, Tuple
 import pygame
 from src.config import (
     POINTS_NORMAL_CAR, POINTS_BUS, POINTS_EMERGENCY, 
@@ -18,11 +19,14 @@ from src.config import (
 class GameEvent:
     """Representa un evento del juego que puede ser procesado"""
     
+    __slots__ = ('event_type', 'data', 'handled', 'response')
+    
     def __init__(self, event_type: str, data: Dict[str, Any]):
         self.event_type = event_type
         self.data = data
         self.handled = False
-        self.response = {}
+        # Solo los manejadores que generan una respuesta la asignan
+        self.response: Optional[Dict[str, Any]] = None
     
     def __repr__(self):
         return f"GameEvent(type={self.event_type}, data={self.data})"
@@ -42,6 +46,10 @@ class EventHandler(ABC):
         self._next_handler = handler
         return handler
     
+    def get_next(self) -> Optional['EventHandler']:
+        """Retorna el siguiente manejador de la cadena"""
+        return self._next_handler
+    
     def handle(self, event: GameEvent) -> GameEvent:
         """
         Procesa el evento y decide si pasarlo al siguiente manejador.
@@ -182,10 +190,10 @@ class ScoreHandler(EventHandler):
             vehicle = event.data.get('vehicle')
             
             # Bonus por vehículos especiales
-            if hasattr(vehicle, 'has_priority') and vehicle.has_priority:
+            if vehicle is not None and vehicle.has_priority:
                 points = POINTS_EMERGENCY
                 message = f"¡Vehículo de emergencia! +{POINTS_EMERGENCY} puntos"
-            elif vehicle.__class__.__name__ == 'Bus':
+            elif vehicle is not None and vehicle.is_bus:
                 points = POINTS_BUS
                 message = f"¡Autobús pasó! +{POINTS_BUS} puntos"
             else:
@@ -320,7 +328,7 @@ class LoggingHandler(EventHandler):
     
     def __init__(self):
         super().__init__()
-        self.event_log = []
+        self.event_log = deque(maxlen=100)  # Solo los últimos 100 eventos
     
     def can_handle(self, event: GameEvent) -> bool:
         return True  # Maneja todos los eventos
@@ -334,10 +342,6 @@ class LoggingHandler(EventHandler):
             'timestamp': pygame.time.get_ticks()
         })
         
-        # Mantener solo los últimos 100 eventos
-        if len(self.event_log) > 100:
-            self.event_log.pop(0)
-        
         # Marca el evento como completamente manejado
         event.handled = True
     
@@ -346,7 +350,7 @@ class LoggingHandler(EventHandler):
     
     def get_recent_events(self, count: int = 5):
         """Retorna los eventos más recientes"""
-        return self.event_log[-count:]
+        return list(self.event_log)[-count:]
 
 
 class EventSystem:
@@ -355,9 +359,26 @@ class EventSystem:
     Facilita la creación y manejo de eventos.
     """
     
+    # Máximo de mensajes renderizados guardados; al llenarse se descarta el más antiguo
+    MESSAGE_CACHE_SIZE = 128
+    
+    # Color de las notificaciones según severidad
+    SEVERITY_COLORS = {
+        'positive': (0, 255, 0),
+        'low': (255, 255, 0),
+        'medium': (255, 165, 0),
+        'high': (255, 0, 0),
+        'info': (255, 255, 255)
+    }
+    
     def __init__(self, game_state: Dict[str, Any]):
         self.game_state = game_state
-        self.notifications = []  # Notificaciones para mostrar en pantalla
+        
+        # Recursos de dibujo de notificaciones, creados una sola vez
+        self.notification_font = pygame.font.Font(None, 28)
+        self._notification_background: Optional[pygame.Surface] = None
+        self._message_cache: Dict[Tuple[str, Tuple[int, int, int]], pygame.Surface] = {}
+        self.notifications = deque()  # Notificaciones para mostrar en pantalla, por antigüedad
         
         # Construir la cadena de manejadores
         self.collision_handler = CollisionHandler(game_state)
@@ -376,66 +397,133 @@ class EventSystem:
         
         # El primer manejador en la cadena
         self.first_handler = self.collision_handler
+        
+        # Recorrido de la cadena ya resuelto por tipo de evento
+        self._routes: Dict[str, Optional[List[EventHandler]]] = {}
+    
+    def _get_route(self, event_type: str) -> Optional[List[EventHandler]]:
+        """
+        Manejadores de la cadena que procesan un tipo de evento, en orden.
+        Todos los manejadores deciden solo por el tipo, así que se resuelve una vez.
+        Retorna None si algún manejador redefine handle(): entonces el evento
+        debe recorrer la cadena completa.
+        """
+        if event_type in self._routes:
+            return self._routes[event_type]
+        
+        probe = GameEvent(event_type, {})
+        route = []
+        handler = self.first_handler
+        while handler:
+            if type(handler).handle is not EventHandler.handle:
+                route = None
+                break
+            if handler.can_handle(probe):
+                route.append(handler)
+            handler = handler.get_next()
+        self._routes[event_type] = route
+        return route
     
     def emit_event(self, event_type: str, data: Dict[str, Any]) -> GameEvent:
         """Emite un evento y lo procesa a través de la cadena"""
         event = GameEvent(event_type, data)
-        processed_event = self.first_handler.handle(event)
+        
+        route = self._get_route(event_type)
+        if route is None:
+            event = self.first_handler.handle(event)
+        else:
+            # Mismo orden y corte que EventHandler.handle(), sin recorrer toda la cadena
+            for handler in route:
+                handler.process(event)
+                if event.handled:
+                    break
         
         # Si hay mensaje de respuesta, agregarlo a las notificaciones
-        if processed_event.response.get('message'):
+        response = event.response
+        if response and response.get('message'):
             self.notifications.append({
-                'message': processed_event.response['message'],
-                'severity': processed_event.response.get('severity', 'info'),
+                'message': response['message'],
+                'severity': response.get('severity', 'info'),
                 'time': pygame.time.get_ticks(),
                 'duration': 2000  # 2 segundos
             })
         
-        return processed_event
+        return event
+    
+    def has_notifications(self) -> bool:
+        """Indica si hay notificaciones pendientes de mostrar"""
+        return bool(self.notifications)
     
     def update_notifications(self) -> None:
         """Limpia notificaciones expiradas"""
         current_time = pygame.time.get_ticks()
-        self.notifications = [
-            n for n in self.notifications 
-            if current_time - n['time'] < n['duration']
-        ]
-    
-    def draw_notifications(self, screen: pygame.Surface) -> None:
-        """Dibuja las notificaciones en pantalla"""
-        font = pygame.font.Font(None, 28)
+        # Todas duran lo mismo, así que expiran en el orden en que llegaron
+        notifications = self.notifications
+        while notifications and current_time - notifications[0]['time'] >= notifications[0]['duration']:
+            notifications.popleft()
+    
+    def draw_notifications(self, screen: pygame.Surface) -> List[pygame.Rect]:
+        """Dibuja las notificaciones en pantalla y retorna las regiones dibujadas"""
         y_offset = 100
+        rects = []
+        current_time = pygame.time.get_ticks()  # Un único instante para todo el frame
         
         for notification in self.notifications:
             # Color según severidad
-            colors = {
-                'positive': (0, 255, 0),
-                'low': (255, 255, 0),
-                'medium': (255, 165, 0),
-                'high': (255, 0, 0),
-                'info': (255, 255, 255)
-            }
-            color = colors.get(notification['severity'], (255, 255, 255))
+            color = self.SEVERITY_COLORS.get(notification['severity'], (255, 255, 255))
             
             # Efecto de fade out
-            elapsed = pygame.time.get_ticks() - notification['time']
+            elapsed = current_time - notification['time']
             alpha = 255 if elapsed < 1500 else int(255 * (1 - (elapsed - 1500) / 500))
             
-            text = font.render(notification['message'], True, color)
+            text = self._render_message(notification['message'], color)
             
             # Fondo semitransparente
             text_rect = text.get_rect(center=(screen.get_width() // 2, y_offset))
-            background = pygame.Surface((text_rect.width + 20, text_rect.height + 10))
-            background.fill((0, 0, 0))
+            size = (text_rect.width + 20, text_rect.height + 10)
+            background = self._get_notification_background(size)
             background.set_alpha(min(180, alpha))
             
-            screen.blit(background, (text_rect.x - 10, text_rect.y - 5))
+            rects.append(screen.blit(background, (text_rect.x - 10, text_rect.y - 5),
+                                     pygame.Rect((0, 0), size)))
             
-            # Aplicar alpha al texto (limitado en pygame básico, pero simula el efecto)
+            # Aplicar alpha al texto (limitado en pygame básico, pero simula el efecto);
+            # la superficie es compartida, pero el alpha se fija justo antes de cada blit
             text.set_alpha(alpha)
             screen.blit(text, text_rect)
             
             y_offset += 40
+        
+        return rects
+    
+    def _render_message(self, message: str, color: Tuple[int, int, int]) -> pygame.Surface:
+        """Renderiza un mensaje reutilizando la superficie si ya se renderizó antes"""
+        key = (message, color)
+        surface = self._message_cache.get(key)
+        if surface is None:
+            if len(self._message_cache) >= self.MESSAGE_CACHE_SIZE:
+                # Los diccionarios conservan el orden de inserción (FIFO)
+                del self._message_cache[next(iter(self._message_cache))]
+            surface = self.notification_font.render(message, True, color).convert_alpha()
+            self._message_cache[key] = surface
+        return surface
+    
+    def _get_notification_background(self, size: Tuple[int, int]) -> pygame.Surface:
+        """
+        Fondo negro compartido por todas las notificaciones; se dibuja solo la parte
+        necesaria y se agranda únicamente si un mensaje no cabe.
+        """
+        background = self._notification_background
+        if (background is None or background.get_width() < size[0]
+                or background.get_height() < size[1]):
+            width, height = size
+            if background is not None:
+                width = max(width, background.get_width())
+                height = max(height, background.get_height())
+            background = pygame.Surface((width, height)).convert()
+            background.fill((0, 0, 0))
+            self._notification_background = background
+        return background
     
     def get_event_log(self, count: int = 5):
         """Retorna los eventos recientes del log"""
@@ -3,16 +3,65 @@ Renderizado de elementos visuales del juego
 """
 
 import pygame
-from typing import List
+from typing import List, Optional, Tuple
 from src.config import (
     SCREEN_WIDTH, SCREEN_HEIGHT, ROAD_COLOR, LINE_COLOR,
     GRASS_COLOR, STOP_LINE_COLOR, STREET_WIDTH, STOP_LINE_DISTANCE
 )
 
 
+def _build_stop_line_rects(center_x: int, center_y: int) -> Tuple[pygame.Rect, ...]:
+    """Calcula los rectángulos de las cuatro líneas de paso"""
+    stop_line_width = 12
+    stop_line_gap = 16
+    rects = []
+    
+    # Línea horizontal izquierda (para vehículos hacia la derecha)
+    for i in range(10):
+        rects.append(pygame.Rect(center_x - STOP_LINE_DISTANCE, 
+                                 center_y - STREET_WIDTH // 2 + i * stop_line_gap, 
+                                 10, stop_line_width))
+    
+    # Línea horizontal derecha (para vehículos hacia la izquierda)
+    for i in range(10):
+        rects.append(pygame.Rect(center_x + STOP_LINE_DISTANCE - 10, 
+                                 center_y - STREET_WIDTH // 2 + i * stop_line_gap, 
+                                 10, stop_line_width))
+    
+    # Línea vertical superior (para vehículos hacia abajo)
+    for i in range(10):
+        rects.append(pygame.Rect(center_x - STREET_WIDTH // 2 + i * stop_line_gap, 
+                                 center_y - STOP_LINE_DISTANCE, 
+                                 stop_line_width, 10))
+    
+    # Línea vertical inferior (para vehículos hacia arriba)
+    for i in range(10):
+        rects.append(pygame.Rect(center_x - STREET_WIDTH // 2 + i * stop_line_gap, 
+                                 center_y + STOP_LINE_DISTANCE - 10, 
+                                 stop_line_width, 10))
+    
+    return tuple(rects)
+
+
 class RoadRenderer:
     """Dibuja las calles e intersección"""
     
+    # Líneas de paso para el centro de la pantalla, calculadas una sola vez
+    STOP_LINE_RECTS = _build_stop_line_rects(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+    
+    def __init__(self):
+        # Fondo estático (césped, calles y líneas) dibujado una sola vez;
+        # requiere que el modo de video ya esté establecido
+        self._road_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        RoadRenderer.draw(self._road_surface)
+    
+    def draw_fast(self, screen: pygame.Surface, area: Optional[pygame.Rect] = None):
+        """Copia el fondo prerenderizado; con `area`, solo esa región"""
+        if area is None:
+            screen.blit(self._road_surface, (0, 0))
+        else:
+            screen.blit(self._road_surface, area, area)
+    
     @staticmethod
     def draw(screen: pygame.Surface):
         """Dibuja el fondo, calles y líneas"""
@@ -59,130 +108,173 @@ class RoadRenderer:
     @staticmethod
     def _draw_stop_lines(screen: pygame.Surface, center_x: int, center_y: int):
         """Dibuja las líneas de paso donde los vehículos deben detenerse"""
-        stop_line_width = 12
-        stop_line_gap = 16
-        
-        # Línea horizontal izquierda (para vehículos hacia la derecha)
-        for i in range(10):
-            pygame.draw.rect(screen, STOP_LINE_COLOR,
-                           (center_x - STOP_LINE_DISTANCE , 
-                            center_y - STREET_WIDTH // 2 + i * stop_line_gap, 
-                            10, stop_line_width))
-        
-        # Línea horizontal derecha (para vehículos hacia la izquierda)
-        for i in range(10):
-            pygame.draw.rect(screen, STOP_LINE_COLOR,
-                           (center_x + STOP_LINE_DISTANCE - 10, 
-                            center_y - STREET_WIDTH // 2 + i * stop_line_gap, 
-                            10, stop_line_width))
-        
-        # Línea vertical superior (para vehículos hacia abajo)
-        for i in range(10):
-            pygame.draw.rect(screen, STOP_LINE_COLOR,
-                           (center_x - STREET_WIDTH // 2 + i * stop_line_gap, 
-                            center_y - STOP_LINE_DISTANCE, 
-                            stop_line_width, 10))
-        
-        # Línea vertical inferior (para vehículos hacia arriba)
-        for i in range(10):
-            pygame.draw.rect(screen, STOP_LINE_COLOR,
-                           (center_x - STREET_WIDTH // 2 + i * stop_line_gap, 
-                            center_y + STOP_LINE_DISTANCE - 10, 
-                            stop_line_width, 10))
+        if (center_x, center_y) == (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2):
+            stop_rects = RoadRenderer.STOP_LINE_RECTS
+        else:
+            stop_rects = _build_stop_line_rects(center_x, center_y)
+        
+        for rect in stop_rects:
+            pygame.draw.rect(screen, STOP_LINE_COLOR, rect)
 
 
 class UIRenderer:
     """Dibuja la interfaz de usuario"""
     
+    # Máximo de textos dinámicos guardados; al llenarse se descarta el menos usado
+    TEXT_CACHE_SIZE = 256
+    
+    # Colores y posiciones fijas del HUD
+    HUD_TEXT_COLOR = (255, 255, 255)
+    HUD_HIGHLIGHT_COLOR = (255, 255, 0)
+    HUD_LIVES_LOW_COLOR = (255, 0, 0)
+    HUD_STATS_COLOR = (200, 200, 200)
+    HUD_SLOW_TIME_COLOR = (0, 255, 255)
+    HUD_MULTIPLIER_COLOR = (255, 215, 0)
+    HUD_POWERUP_X = SCREEN_WIDTH - 200
+    
     def __init__(self):
         self.font_large = pygame.font.Font(None, 48)
         self.font_medium = pygame.font.Font(None, 36)
         self.font_small = pygame.font.Font(None, 24)
+        
+        # Textos ya renderizados, por (fuente, texto, color)
+        self._text_cache = {}
+        
+        # Valores mostrados en el último HUD y los textos (superficie, posición) que generaron
+        self._hud_values = None
+        self._hud_blits: List[Tuple[pygame.Surface, Tuple[int, int]]] = []
+        
+        # Textos fijos renderizados una sola vez
+        self.help_text = self.font_small.render(
+            "Click en semáforos para cambiar luces | ESPACIO: Pausar | ESC: Salir",
+            True, (150, 150, 150)).convert_alpha()
+        self.pause_text = self.font_large.render("PAUSA", True, (255, 255, 255)).convert_alpha()
+        self.game_over_text = self.font_large.render("GAME OVER", True, (255, 0, 0)).convert_alpha()
+        self.restart_text = self.font_small.render(
+            "Presiona R para reiniciar o ESC para salir", 
+            True, (255, 255, 0)).convert_alpha()
+        self.slow_time_text = self.font_small.render(
+            "⏱ TIEMPO LENTO", True, self.HUD_SLOW_TIME_COLOR).convert_alpha()
+        
+        # Superficies semitransparentes fijas, creadas una sola vez
+        self.hud_panel = self._make_overlay((SCREEN_WIDTH, 80), (30, 30, 30), 200)
+        self.pause_overlay = self._make_overlay((SCREEN_WIDTH, SCREEN_HEIGHT), (0, 0, 0), 100)
+        self.game_over_overlay = self._make_overlay((SCREEN_WIDTH, SCREEN_HEIGHT), (0, 0, 0), 200)
+    
+    @staticmethod
+    def _make_overlay(size: Tuple[int, int], color: Tuple[int, int, int],
+                      alpha: int) -> pygame.Surface:
+        """Crea una superficie de un color con transparencia uniforme"""
+        overlay = pygame.Surface(size).convert()
+        overlay.fill(color)
+        overlay.set_alpha(alpha)
+        return overlay
+    
+    def render_text(self, font: pygame.font.Font, text: str,
+                    color: Tuple[int, int, int]) -> pygame.Surface:
+        """Renderiza un texto reutilizando la superficie si ya se renderizó antes"""
+        key = (id(font), text, color)
+        surface = self._text_cache.pop(key, None)
+        if surface is None:
+            if len(self._text_cache) >= self.TEXT_CACHE_SIZE:
+                # Los diccionarios conservan el orden de inserción: el primero
+                # es el usado hace más tiempo (LRU)
+                del self._text_cache[next(iter(self._text_cache))]
+            surface = font.render(text, True, color).convert_alpha()
+        # Reinsertarlo lo deja como el más reciente
+        self._text_cache[key] = surface
+        return surface
     
-    def draw_hud(self, screen: pygame.Surface, game_state: dict):
-        """Dibuja el HUD (puntos, vidas, nivel)"""
+    def draw_hud(self, screen: pygame.Surface, game_state: dict) -> List[pygame.Rect]:
+        """Dibuja el HUD (puntos, vidas, nivel) y retorna las regiones dibujadas"""
         # Panel superior
-        panel_height = 80
-        panel = pygame.Surface((SCREEN_WIDTH, panel_height))
-        panel.fill((30, 30, 30))
-        panel.set_alpha(200)
-        screen.blit(panel, (0, 0))
+        panel_rect = screen.blit(self.hud_panel, (0, 0))
+        
+        # Los textos solo se vuelven a formatear cuando cambia algún valor mostrado
+        values = (game_state['score'], game_state['lives'], game_state['level'],
+                  game_state['vehicles_passed'], game_state['collisions'],
+                  game_state['violations'], game_state.get('time_scale', 1.0),
+                  game_state.get('score_multiplier', 1.0))
+        if values != self._hud_values:
+            self._hud_values = values
+            self._hud_blits = self._build_hud_blits(game_state)
+        screen.blits(self._hud_blits, doreturn=False)
+        
+        # Instrucciones
+        help_rect = screen.blit(self.help_text, (20, SCREEN_HEIGHT - 30))
         
+        # El resto del HUD queda dentro del panel
+        return [panel_rect, help_rect]
+    
+    def _build_hud_blits(self, game_state: dict) -> List[Tuple[pygame.Surface, Tuple[int, int]]]:
+        """Genera los textos del HUD con su posición"""
         # Puntuación
-        score_text = self.font_medium.render(f"Puntos: {game_state['score']}", 
-                                            True, (255, 255, 255))
-        screen.blit(score_text, (20, 20))
+        score_text = self.render_text(self.font_medium, f"Puntos: {game_state['score']}", 
+                                      self.HUD_TEXT_COLOR)
         
         # Vidas
-        lives_color = (255, 0, 0) if game_state['lives'] <= 2 else (255, 255, 0)
-        lives_text = self.font_medium.render(f"Vidas: {game_state['lives']}", 
-                                            True, lives_color)
-        screen.blit(lives_text, (250, 20))
+        lives_color = self.HUD_LIVES_LOW_COLOR if game_state['lives'] <= 2 else self.HUD_HIGHLIGHT_COLOR
+        lives_text = self.render_text(self.font_medium, f"Vidas: {game_state['lives']}", 
+                                      lives_color)
         
         # Nivel
-        level_text = self.font_medium.render(f"Nivel: {game_state['level']}", 
-                                            True, (255, 255, 0))
-        screen.blit(level_text, (450, 20))
+        level_text = self.render_text(self.font_medium, f"Nivel: {game_state['level']}",
+                                      self.HUD_HIGHLIGHT_COLOR)
         
         # Estadísticas
-        stats_text = self.font_small.render(
+        stats_text = self.render_text(
+            self.font_small,
             f"Pasados: {game_state['vehicles_passed']} | "
             f"Colisiones: {game_state['collisions']} | "
             f"Infracciones: {game_state['violations']}", 
-            True, (200, 200, 200))
-        screen.blit(stats_text, (650, 30))
+            self.HUD_STATS_COLOR)
         
-        # Power-ups activos
-        self._draw_active_powerups(screen, game_state)
+        blits = [(score_text, (20, 20)), (lives_text, (250, 20)),
+                 (level_text, (450, 20)), (stats_text, (650, 30))]
         
-        # Instrucciones
-        help_text = self.font_small.render(
-            "Click en semáforos para cambiar luces | ESPACIO: Pausar | ESC: Salir",
-            True, (150, 150, 150))
-        screen.blit(help_text, (20, SCREEN_HEIGHT - 30))
+        # Power-ups activos
+        blits.extend(self._get_active_powerup_blits(game_state))
+        return blits
     
-    def _draw_active_powerups(self, screen: pygame.Surface, game_state: dict):
-        """Dibuja indicadores de power-ups activos"""
+    def _get_active_powerup_blits(self, game_state: dict) -> List[Tuple[pygame.Surface, Tuple[int, int]]]:
+        """Genera los indicadores de power-ups activos con su posición"""
+        blits = []
         y_pos = 25
         
         if game_state.get('time_scale', 1.0) < 1.0:
-            powerup_text = self.font_small.render("⏱ TIEMPO LENTO", True, (0, 255, 255))
-            screen.blit(powerup_text, (SCREEN_WIDTH - 200, y_pos))
+            blits.append((self.slow_time_text, (self.HUD_POWERUP_X, y_pos)))
             y_pos += 25
         
         if game_state.get('score_multiplier', 1.0) > 1.0:
-            mult_text = self.font_small.render(
+            # El texto va redondeado a un decimal, así que la caché guarda pocas variantes
+            mult_text = self.render_text(
+                self.font_small,
                 f"✨ PUNTOS x{game_state['score_multiplier']:.1f}", 
-                True, (255, 215, 0))
-            screen.blit(mult_text, (SCREEN_WIDTH - 200, y_pos))
+                self.HUD_MULTIPLIER_COLOR)
+            blits.append((mult_text, (self.HUD_POWERUP_X, y_pos)))
+        
+        return blits
     
     def draw_pause_screen(self, screen: pygame.Surface):
         """Dibuja la pantalla de pausa"""
-        pause_overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pause_overlay.fill((0, 0, 0))
-        pause_overlay.set_alpha(100)
-        screen.blit(pause_overlay, (0, 0))
+        screen.blit(self.pause_overlay, (0, 0))
         
-        pause_text = self.font_large.render("PAUSA", True, (255, 255, 255))
-        text_rect = pause_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
-        screen.blit(pause_text, text_rect)
+        text_rect = self.pause_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
+        screen.blit(self.pause_text, text_rect)
     
     def draw_game_over(self, screen: pygame.Surface, game_state: dict):
         """Dibuja la pantalla de Game Over"""
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.fill((0, 0, 0))
-        overlay.set_alpha(200)
-        screen.blit(overlay, (0, 0))
+        screen.blit(self.game_over_overlay, (0, 0))
         
         # Texto principal
-        game_over_text = self.font_large.render("GAME OVER", True, (255, 0, 0))
-        text_rect = game_over_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100))
-        screen.blit(game_over_text, text_rect)
+        text_rect = self.game_over_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100))
+        screen.blit(self.game_over_text, text_rect)
         
         # Puntuación final
-        score_text = self.font_medium.render(
+        score_text = self.render_text(
+            self.font_medium,
             f"Puntuación Final: {game_state['score']}", 
-            True, (255, 255, 255))
+            (255, 255, 255))
         score_rect = score_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
         screen.blit(score_text, score_rect)
         
@@ -196,14 +288,11 @@ class UIRenderer:
         
         y_offset = SCREEN_HEIGHT // 2 + 60
         for line in stats_lines:
-            text = self.font_small.render(line, True, (200, 200, 200))
+            text = self.render_text(self.font_small, line, (200, 200, 200))
             text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, y_offset))
             screen.blit(text, text_rect)
             y_offset += 35
         
         # Instrucciones
-        restart_text = self.font_small.render(
-            "Presiona R para reiniciar o ESC para salir", 
-            True, (255, 255, 0))
-        restart_rect = restart_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100))
-        screen.blit(restart_text, restart_rect)
+        restart_rect = self.restart_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100))
+        screen.blit(self.restart_text, restart_rect)
@@ -5,7 +5,7 @@ Implementación de semáforos con diferentes estados y transiciones
 
 import pygame
 from abc import ABC, abstractmethod
-from typing import Tuple
+from typing import Callable, Dict, List, Tuple
 
 
 class TrafficLightState(ABC):
@@ -14,6 +14,8 @@ class TrafficLightState(ABC):
     Cada estado concreto implementa su comportamiento específico.
     """
     
+    __slots__ = ('traffic_light', 'time_in_state')
+    
     def __init__(self, traffic_light: 'TrafficLight'):
         self.traffic_light = traffic_light
         self.time_in_state = 0
@@ -62,6 +64,8 @@ class TrafficLightState(ABC):
 class GreenState(TrafficLightState):
     """Estado Verde - Los vehículos pueden pasar"""
     
+    __slots__ = ()
+    
     def get_color(self) -> Tuple[int, int, int]:
         return (0, 255, 0)  # Verde
     
@@ -86,6 +90,8 @@ class GreenState(TrafficLightState):
 class YellowState(TrafficLightState):
     """Estado Amarillo - Advertencia, los vehículos deben prepararse para detenerse"""
     
+    __slots__ = ()
+    
     def get_color(self) -> Tuple[int, int, int]:
         return (255, 255, 0)  # Amarillo
     
@@ -106,6 +112,8 @@ class YellowState(TrafficLightState):
 class RedState(TrafficLightState):
     """Estado Rojo - Los vehículos deben detenerse"""
     
+    __slots__ = ()
+    
     def get_color(self) -> Tuple[int, int, int]:
         return (255, 0, 0)  # Rojo
     
@@ -128,6 +136,19 @@ class TrafficLight:
     Permite cambiar entre estados y delega el comportamiento al estado actual.
     """
     
+    __slots__ = ('x', 'y', 'direction', 'green_duration', 'yellow_duration',
+                 'red_duration', '_state_listeners', '_state', 'manual_override', 'size')
+    
+    # Luz encendida por estado: (desplazamiento vertical, color, color del halo)
+    LIT_LIGHTS = {
+        "RED": (-25, (255, 0, 0), (255, 100, 100)),
+        "YELLOW": (0, (255, 255, 0), (255, 255, 100)),
+        "GREEN": (25, (0, 255, 0), (100, 255, 100))
+    }
+    
+    # Imagen completa del semáforo por estado, compartida por todos los semáforos
+    _sprites: Dict[str, pygame.Surface] = {}
+    
     def __init__(self, x: int, y: int, direction: str, 
                  green_duration: float = 5.0,
                  yellow_duration: float = 2.0,
@@ -139,6 +160,9 @@ class TrafficLight:
         self.yellow_duration = yellow_duration
         self.red_duration = red_duration
         
+        # Observadores notificados en cada cambio de estado
+        self._state_listeners: List[Callable[['TrafficLight'], None]] = []
+        
         # Estado inicial
         self._state = RedState(self)
         self._state.on_enter()
@@ -151,6 +175,13 @@ class TrafficLight:
         self._state.on_exit()
         self._state = new_state
         self._state.on_enter()
+        
+        for listener in self._state_listeners:
+            listener(self)
+    
+    def add_state_listener(self, listener: Callable[['TrafficLight'], None]) -> None:
+        """Registra una función que se llama cada vez que el semáforo cambia de estado"""
+        self._state_listeners.append(listener)
     
     def update(self, dt: float) -> None:
         """Actualiza el semáforo (automático si no hay override manual)"""
@@ -173,32 +204,38 @@ class TrafficLight:
         """Retorna el tiempo restante en el estado actual"""
         return max(0, self._state.get_duration() - self._state.time_in_state)
     
-    def draw(self, screen: pygame.Surface) -> None:
-        """Dibuja el semáforo en pantalla"""
-        # Fondo del semáforo
+    def draw(self, screen: pygame.Surface) -> pygame.Rect:
+        """Dibuja el semáforo en pantalla y retorna la región dibujada"""
         background_rect = pygame.Rect(self.x - 15, self.y - 45, 30, 90)
-        pygame.draw.rect(screen, (50, 50, 50), background_rect, border_radius=5)
-        
-        # Las tres luces
-        red_pos = (self.x, self.y - 25)
-        yellow_pos = (self.x, self.y)
-        green_pos = (self.x, self.y + 25)
-        
-        # Dibuja todas las luces apagadas primero
-        for pos in [red_pos, yellow_pos, green_pos]:
-            pygame.draw.circle(screen, (30, 30, 30), pos, 10)
-        
-        # Dibuja la luz activa
-        state_name = self.get_state_name()
-        if state_name == "RED":
-            pygame.draw.circle(screen, (255, 0, 0), red_pos, 10)
-            pygame.draw.circle(screen, (255, 100, 100), red_pos, 12, 2)
-        elif state_name == "YELLOW":
-            pygame.draw.circle(screen, (255, 255, 0), yellow_pos, 10)
-            pygame.draw.circle(screen, (255, 255, 100), yellow_pos, 12, 2)
-        elif state_name == "GREEN":
-            pygame.draw.circle(screen, (0, 255, 0), green_pos, 10)
-            pygame.draw.circle(screen, (100, 255, 100), green_pos, 12, 2)
+        screen.blit(TrafficLight.get_sprite(self.get_state_name()), background_rect)
+        return background_rect
+    
+    @staticmethod
+    def get_sprite(state_name: str) -> pygame.Surface:
+        """Retorna la imagen del semáforo en un estado, dibujándola una sola vez"""
+        sprite = TrafficLight._sprites.get(state_name)
+        if sprite is None:
+            sprite = pygame.Surface((30, 90), pygame.SRCALPHA).convert_alpha()
+            center_x, center_y = 15, 45
+            
+            # Fondo del semáforo
+            pygame.draw.rect(sprite, (50, 50, 50), sprite.get_rect(), border_radius=5)
+            
+            # Dibuja la luz activa
+            lit_offset = None
+            if state_name in TrafficLight.LIT_LIGHTS:
+                lit_offset, color, halo_color = TrafficLight.LIT_LIGHTS[state_name]
+                pos = (center_x, center_y + lit_offset)
+                pygame.draw.circle(sprite, color, pos, 10)
+                pygame.draw.circle(sprite, halo_color, pos, 12, 2)
+            
+            # Solo el resto de las luces se dibuja apagado
+            for offset in (-25, 0, 25):
+                if offset != lit_offset:
+                    pygame.draw.circle(sprite, (30, 30, 30), (center_x, center_y + offset), 10)
+            
+            TrafficLight._sprites[state_name] = sprite
+        return sprite
     
     # Métodos para control manual del jugador
     def toggle_manual_override(self) -> None:
@@ -242,10 +279,18 @@ class TrafficLightController:
     Asegura que semáforos perpendiculares no estén verdes al mismo tiempo.
     """
     
+    __slots__ = ('traffic_lights', 'horizontal_lights', 'vertical_lights',
+                 'light_directions', 'light_summary')
+    
     def __init__(self):
         self.traffic_lights = []
         self.horizontal_lights = []
         self.vertical_lights = []
+        
+        # Dirección de tráfico que controla cada semáforo y, por dirección,
+        # si se puede pasar (se refresca solo cuando un semáforo cambia de estado)
+        self.light_directions: Dict[TrafficLight, str] = {}
+        self.light_summary: Dict[str, bool] = {}
     
     def add_traffic_light(self, traffic_light: TrafficLight) -> None:
         """Agrega un semáforo al controlador"""
@@ -256,6 +301,16 @@ class TrafficLightController:
         else:
             self.vertical_lights.append(traffic_light)
     
+    def assign_direction(self, traffic_light: TrafficLight, direction: str) -> None:
+        """Asigna al semáforo la dirección de tráfico ('right', 'left', 'down', 'up') que controla"""
+        self.light_directions[traffic_light] = direction
+        self.light_summary[direction] = traffic_light.can_pass()
+        traffic_light.add_state_listener(self._on_light_changed)
+    
+    def _on_light_changed(self, traffic_light: TrafficLight) -> None:
+        """Observador de semáforos: refresca el resumen de la dirección afectada"""
+        self.light_summary[self.light_directions[traffic_light]] = traffic_light.can_pass()
+    
     def update(self, dt: float) -> None:
         """Actualiza todos los semáforos"""
         for light in self.traffic_lights:
@@ -269,22 +324,28 @@ class TrafficLightController:
         Asegura que los semáforos perpendiculares estén coordinados.
         Si los horizontales están en verde, los verticales deben estar en rojo.
         """
-        for h_light in self.horizontal_lights:
-            if not h_light.manual_override and h_light.can_pass():
-                for v_light in self.vertical_lights:
-                    if not v_light.manual_override and v_light.can_pass():
-                        # Conflicto: forzar uno a rojo
-                        v_light.change_state(RedState(v_light))
-    
-    def draw_all(self, screen: pygame.Surface) -> None:
-        """Dibuja todos los semáforos"""
-        for light in self.traffic_lights:
-            light.draw(screen)
+        # Basta con que un horizontal automático esté en verde; forzar los
+        # verticales no cambia esa condición, así que se recorre cada grupo una vez
+        if not any(not h_light.manual_override and h_light.can_pass()
+                   for h_light in self.horizontal_lights):
+            return
+        
+        for v_light in self.vertical_lights:
+            if not v_light.manual_override and v_light.can_pass():
+                # Conflicto: forzar uno a rojo
+                v_light.change_state(RedState(v_light))
+    
+    def draw_all(self, screen: pygame.Surface) -> List[pygame.Rect]:
+        """Dibuja todos los semáforos y retorna las regiones dibujadas"""
+        return [light.draw(screen) for light in self.traffic_lights]
     
     def get_light_at_position(self, x: int, y: int, tolerance: int = 30) -> TrafficLight:
         """Encuentra el semáforo más cercano a una posición (para clicks)"""
+        # Comparar distancias al cuadrado evita la raíz
+        max_distance_sq = tolerance * tolerance
         for light in self.traffic_lights:
-            distance = ((light.x - x) ** 2 + (light.y - y) ** 2) ** 0.5
-            if distance <= tolerance:
+            dx = light.x - x
+            dy = light.y - y
+            if dx * dx + dy * dy <= max_distance_sq:
                 return light
         return None
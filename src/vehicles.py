@@ -6,8 +6,9 @@ Implementación de vehículos con comportamiento base y variaciones específicas
 import pygame
 import random
 import os
+import bisect
 from abc import ABC, abstractmethod
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Callable
 
 
 class Vehicle(ABC):
@@ -16,23 +17,54 @@ class Vehicle(ABC):
     Define el esqueleto del algoritmo de movimiento y comportamiento de vehículos.
     """
     
+    __slots__ = ('x', 'y', 'direction', 'dx', 'dy', 'lane', 'speed', 'max_speed',
+                 'acceleration', 'size', 'rect_size', 'color', 'stopped', 'waiting_time',
+                 'has_priority', 'removed', 'parked', 'on_stopped_changed', 'original_image', 'image')
+    
+    # Indica si el vehículo es un autobús (otorga bonus al pasar)
+    is_bus = False
+    
+    # Vector unitario de avance (dx, dy) según la dirección
+    DIRECTION_VECTORS = {'right': (1, 0), 'left': (-1, 0), 'down': (0, 1), 'up': (0, -1)}
+    
+    # Ángulo de rotación de la imagen original (orientada a la derecha)
+    ROTATION_ANGLES = {'right': 0, 'left': 180, 'down': 270, 'up': 90}
+    
+    # Carpeta de imágenes (assets/vehicles), resuelta una sola vez
+    IMAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              'assets', 'vehicles')
+    
+    # Imágenes cargadas y escaladas compartidas, por (nombre de imagen, tamaño)
+    _loaded_images = {}
+    
+    # Imágenes rotadas compartidas, por (nombre de imagen, dirección)
+    _rotated_images = {}
+    
     def __init__(self, x: float, y: float, direction: str, lane: int):
         self.x = x
         self.y = y
         self.direction = direction  # 'up', 'down', 'left', 'right'
+        self.dx, self.dy = Vehicle.DIRECTION_VECTORS[direction]
         self.lane = lane
         self.speed = self.get_base_speed()
         self.max_speed = self.get_max_speed()
         self.acceleration = self.get_acceleration()
         self.size = self.get_size()
+        # Tamaño (ancho, alto) en pantalla: la dirección no cambia, se orienta una vez
+        self.rect_size = self.size if self.dy == 0 else (self.size[1], self.size[0])
         self.color = self.get_color()
         self.stopped = False
         self.waiting_time = 0
         self.has_priority = self.check_priority()
+        self.removed = False  # Marcado para eliminar al final del frame
+        self.parked = False  # Esperando en la cola de su semáforo, sin actualizarse
+        
+        # Observador opcional que recibe +1/-1 cuando cambia `stopped`
+        self.on_stopped_changed: Optional[Callable[[int], None]] = None
         
         # Cargar imagen si existe
-        self.image = self.load_image()
-        self.original_image = self.image  # Guardar original para rotaciones
+        self.original_image = self.load_image()  # Guardar original para rotaciones
+        self.image = self.get_rotated_image()  # Imagen ya orientada según la dirección
         
     # Template Method - Define el esqueleto del algoritmo
     def update(self, dt: float, can_move: bool) -> None:
@@ -46,11 +78,11 @@ class Vehicle(ABC):
         # 2. Ajustar velocidad según condiciones
         if can_move:
             self.accelerate(dt)
-            self.stopped = False
+            self.set_stopped(False)
             self.waiting_time = 0
         else:
             self.decelerate(dt)
-            self.stopped = True
+            self.set_stopped(True)
             self.waiting_time += dt
         
         # 3. Mover el vehículo
@@ -59,16 +91,18 @@ class Vehicle(ABC):
         # 4. Aplicar comportamiento post-movimiento
         self.post_move_behavior()
     
+    def set_stopped(self, stopped: bool) -> None:
+        """Actualiza el indicador de detención y notifica al observador si cambia"""
+        if stopped != self.stopped:
+            self.stopped = stopped
+            if self.on_stopped_changed:
+                self.on_stopped_changed(1 if stopped else -1)
+    
     def move(self, dt: float) -> None:
         """Mueve el vehículo según su dirección y velocidad"""
-        if self.direction == 'right':
-            self.x += self.speed * dt
-        elif self.direction == 'left':
-            self.x -= self.speed * dt
-        elif self.direction == 'down':
-            self.y += self.speed * dt
-        elif self.direction == 'up':
-            self.y -= self.speed * dt
+        step = self.speed * dt
+        self.x += self.dx * step
+        self.y += self.dy * step
     
     def accelerate(self, dt: float) -> None:
         """Acelera el vehículo hasta su velocidad máxima"""
@@ -80,40 +114,45 @@ class Vehicle(ABC):
         if self.speed > 0:
             self.speed = max(self.speed - self.acceleration * 2 * dt, 0)
     
+    def get_rotated_image(self) -> Optional[pygame.Surface]:
+        """Retorna la imagen orientada según la dirección, rotándola una sola vez por tipo"""
+        if not self.original_image:
+            return None
+        
+        key = (self.get_image_name(), self.direction)
+        rotated_image = Vehicle._rotated_images.get(key)
+        if rotated_image is None:
+            rotated_image = pygame.transform.rotate(self.original_image,
+                                                    Vehicle.ROTATION_ANGLES[self.direction])
+            Vehicle._rotated_images[key] = rotated_image
+        return rotated_image
+    
+    def get_blit(self) -> Optional[Tuple[pygame.Surface, pygame.Rect]]:
+        """Retorna (imagen, destino) para dibujar en lote con Surface.blits, o None sin imagen"""
+        if not self.image:
+            return None
+        # Centrar la imagen en la posición del vehículo
+        return self.image, self.image.get_rect(center=(int(self.x), int(self.y)))
+    
     def draw(self, screen: pygame.Surface) -> None:
         """Dibuja el vehículo en pantalla (con imagen o rectángulo de respaldo)"""
         if self.image:
-            # Usar imagen PNG
-            # Rotar imagen según dirección
-            if self.direction == 'right':
-                rotated_image = self.original_image
-            elif self.direction == 'left':
-                rotated_image = pygame.transform.rotate(self.original_image, 180)
-            elif self.direction == 'down':
-                rotated_image = pygame.transform.rotate(self.original_image, 270)
-            else:  # up
-                rotated_image = pygame.transform.rotate(self.original_image, 90)
-            
-            # Centrar la imagen en la posición del vehículo
-            rect = rotated_image.get_rect(center=(int(self.x), int(self.y)))
-            screen.blit(rotated_image, rect)
-            
-            # Indicador de prioridad
-            if self.has_priority:
-                pygame.draw.circle(screen, (255, 255, 0), (int(self.x), int(self.y)), 5)
+            # Usar imagen PNG ya rotada
+            screen.blit(*self.get_blit())
         else:
-            # Dibujar rectángulo de respaldo (código original)
-            if self.direction in ['left', 'right']:
-                width, height = self.size[0], self.size[1]
-            else:
-                width, height = self.size[1], self.size[0]
-            
-            rect = pygame.Rect(self.x - width // 2, self.y - height // 2, width, height)
-            pygame.draw.rect(screen, self.color, rect)
-            
-            # Indicador de prioridad
-            if self.has_priority:
-                pygame.draw.circle(screen, (255, 255, 0), (int(self.x), int(self.y)), 5)
+            self.draw_fallback(screen)
+        
+        self.draw_overlay(screen)
+    
+    def draw_fallback(self, screen: pygame.Surface) -> None:
+        """Dibuja un rectángulo de respaldo cuando no hay imagen"""
+        pygame.draw.rect(screen, self.color, self.get_rect())
+    
+    def draw_overlay(self, screen: pygame.Surface) -> None:
+        """Dibuja los indicadores sobre el vehículo"""
+        # Indicador de prioridad
+        if self.has_priority:
+            pygame.draw.circle(screen, (255, 255, 0), (int(self.x), int(self.y)), 5)
     
     def is_off_screen(self, screen_width: int, screen_height: int) -> bool:
         """Verifica si el vehículo salió de la pantalla"""
@@ -123,10 +162,7 @@ class Vehicle(ABC):
     
     def get_rect(self) -> pygame.Rect:
         """Retorna el rectángulo de colisión del vehículo"""
-        if self.direction in ['left', 'right']:
-            width, height = self.size[0], self.size[1]
-        else:
-            width, height = self.size[1], self.size[0]
+        width, height = self.rect_size
         return pygame.Rect(self.x - width // 2, self.y - height // 2, width, height)
     
     # Métodos abstractos que deben ser implementados por las subclases
@@ -160,14 +196,18 @@ class Vehicle(ABC):
         return None
     
     def load_image(self) -> Optional[pygame.Surface]:
-        """Carga la imagen del vehículo si existe"""
+        """Carga la imagen del vehículo si existe, una sola vez por tipo"""
         image_name = self.get_image_name()
         if not image_name:
             return None
         
+        key = (image_name, self.size)
+        if key in Vehicle._loaded_images:
+            return Vehicle._loaded_images[key]
+        
+        image = None
         # Buscar en la carpeta assets/vehicles
-        base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        image_path = os.path.join(base_path, 'assets', 'vehicles', image_name)
+        image_path = os.path.join(Vehicle.IMAGES_DIR, image_name)
         
         if os.path.exists(image_path):
             try:
@@ -175,11 +215,13 @@ class Vehicle(ABC):
                 # Escalar imagen al tamaño definido
                 width, height = self.size
                 image = pygame.transform.scale(image, (width, height))
-                return image
             except Exception as e:
                 print(f"Error cargando imagen {image_name}: {e}")
-                return None
-        return None
+                image = None
+        
+        # También se recuerda la ausencia de imagen para no reintentar cada vez
+        Vehicle._loaded_images[key] = image
+        return image
     
     # Hooks - Métodos opcionales que las subclases pueden sobrescribir
     def special_behavior(self, dt: float) -> None:
@@ -193,11 +235,20 @@ class Vehicle(ABC):
     def check_priority(self) -> bool:
         """Hook para determinar si el vehículo tiene prioridad"""
         return False
+    
+    def is_idle_while_stopped(self) -> bool:
+        """
+        Hook que indica si el vehículo detenido no cambia por sí solo.
+        Si es True, el juego puede dejar de actualizarlo mientras espera un semáforo.
+        """
+        return True
 
 
 class Car(Vehicle):
     """Vehículo estándar - Velocidad media"""
     
+    __slots__ = ()
+    
     def get_base_speed(self) -> float:
         return 100
     
@@ -223,6 +274,8 @@ class Car(Vehicle):
 class FastCar(Vehicle):
     """Vehículo rápido - Alta velocidad y aceleración"""
     
+    __slots__ = ()
+    
     def get_base_speed(self) -> float:
         return 150
     
@@ -244,7 +297,7 @@ class FastCar(Vehicle):
     def special_behavior(self, dt: float) -> None:
         """Los autos rápidos pueden zigzaguear ligeramente"""
         if not self.stopped and random.random() < 0.01:
-            if self.direction in ['left', 'right']:
+            if self.dy == 0:  # Movimiento horizontal
                 self.y += random.randint(-2, 2)
             else:
                 self.x += random.randint(-2, 2)
@@ -253,6 +306,10 @@ class FastCar(Vehicle):
 class Bus(Vehicle):
     """Autobús - Lento pero grande"""
     
+    __slots__ = ()
+    
+    is_bus = True
+    
     def get_base_speed(self) -> float:
         return 60
     
@@ -280,11 +337,25 @@ class Bus(Vehicle):
         # Reanudar después de "parada"
         if self.speed == 0 and self.waiting_time > 1.0 and random.random() < 0.1:
             self.speed = self.get_base_speed()
+    
+    def is_idle_while_stopped(self) -> bool:
+        """Los autobuses pueden reanudar la marcha por sí solos tras una parada"""
+        return False
 
 
 class EmergencyVehicle(Vehicle):
     """Vehículo de emergencia - Prioridad absoluta"""
     
+    __slots__ = ()
+    
+    # Fase de la sirena, compartida por todos los vehículos de emergencia
+    siren_on = True
+    
+    @classmethod
+    def update_siren(cls, ticks: int) -> None:
+        """Calcula una vez por frame si la sirena está encendida"""
+        cls.siren_on = ticks % 500 < 250
+    
     def get_base_speed(self) -> float:
         return 180
     
@@ -307,16 +378,17 @@ class EmergencyVehicle(Vehicle):
         """Vehículos de emergencia siempre tienen prioridad"""
         return True
     
-    def draw(self, screen: pygame.Surface) -> None:
+    def is_idle_while_stopped(self) -> bool:
+        """Los vehículos de emergencia cambian de carril para rebasar la cola detenida"""
+        return False
+    
+    def draw_overlay(self, screen: pygame.Surface) -> None:
         """Dibuja con efecto de luz de emergencia"""
-        super().draw(screen)
+        super().draw_overlay(screen)
         
         # Efecto de sirena parpadeante
-        if pygame.time.get_ticks() % 500 < 250:
-            if self.direction in ['left', 'right']:
-                width, height = self.size[0], self.size[1]
-            else:
-                width, height = self.size[1], self.size[0]
+        if EmergencyVehicle.siren_on:
+            width = self.rect_size[0]
             
             pygame.draw.circle(screen, (255, 255, 255), 
                              (int(self.x - width // 4), int(self.y)), 5)
@@ -327,6 +399,8 @@ class EmergencyVehicle(Vehicle):
 class Truck(Vehicle):
     """Camión - Muy lento y muy grande"""
     
+    __slots__ = ()
+    
     def get_base_speed(self) -> float:
         return 50
     
@@ -355,34 +429,29 @@ class Truck(Vehicle):
 class VehicleFactory:
     """Factory para crear diferentes tipos de vehículos"""
     
+    VEHICLE_TYPES = {
+        'car': Car,
+        'fast_car': FastCar,
+        'bus': Bus,
+        'emergency': EmergencyVehicle,
+        'truck': Truck
+    }
+    
+    # Probabilidades acumuladas de aparición: 50% auto normal, 20% auto rápido,
+    # 15% autobús, 10% camión y el 5% restante emergencia
+    SPAWN_THRESHOLDS = (0.5, 0.7, 0.85, 0.95)
+    SPAWN_CLASSES = (Car, FastCar, Bus, Truck, EmergencyVehicle)
+    
     @staticmethod
     def create_vehicle(vehicle_type: str, x: float, y: float, 
                       direction: str, lane: int) -> Vehicle:
         """Crea un vehículo según el tipo especificado"""
-        vehicles = {
-            'car': Car,
-            'fast_car': FastCar,
-            'bus': Bus,
-            'emergency': EmergencyVehicle,
-            'truck': Truck
-        }
-        
-        vehicle_class = vehicles.get(vehicle_type, Car)
+        vehicle_class = VehicleFactory.VEHICLE_TYPES.get(vehicle_type, Car)
         return vehicle_class(x, y, direction, lane)
     
     @staticmethod
     def create_random_vehicle(x: float, y: float, 
                             direction: str, lane: int) -> Vehicle:
         """Crea un vehículo aleatorio con probabilidades ponderadas"""
-        rand = random.random()
-        
-        if rand < 0.5:  # 50% auto normal
-            return Car(x, y, direction, lane)
-        elif rand < 0.7:  # 20% auto rápido
-            return FastCar(x, y, direction, lane)
-        elif rand < 0.85:  # 15% autobús
-            return Bus(x, y, direction, lane)
-        elif rand < 0.95:  # 10% camión
-            return Truck(x, y, direction, lane)
-        else:  # 5% emergencia
-            return EmergencyVehicle(x, y, direction, lane)
+        index = bisect.bisect_right(VehicleFactory.SPAWN_THRESHOLDS, random.random())
+        return VehicleFactory.SPAWN_CLASSES[index](x, y, direction, lane)